@@ -5,20 +5,229 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import time
+import numpy as np
+from collections import namedtuple
 import sys
 import os
 
 # ===== 添加当前目录到Python路径 =====
 sys.path.append(os.path.dirname(__file__))
 
-# ===== PWA相关函数 =====
-def add_pwa_assets():
-    """添加PWA资源到页面head"""
-    pwa_html = """
+from cities import GUIZHOU_CITIES
+
+# ===== 数据加载器缓存 =====
+@st.cache_resource(show_spinner=False)
+def _get_loader(city):
+    """按城市缓存数据加载器，避免每次重跑都重新构建"""
+    from data_sources import RealWeatherDataLoader
+    return RealWeatherDataLoader(city)
+
+# 实时数据中可能缺失的列及其默认值
+_REALTIME_DEFAULTS = {'pressure': 1013.0, 'wind_speed': 0.0, 'wind_gusts': 0.0, 'uv_index': 0.0}
+
+class _UncachedResult(Exception):
+    """携带离线兜底数据跳出缓存函数：st.cache_data不缓存抛出异常的调用"""
+    
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_realtime_cached(city):
+    """获取实时数据并补齐缺失列，离线兜底数据通过_UncachedResult返回"""
+    realtime = _get_loader(city).get_realtime_data()
+    # 补齐缺失列，下游无需再逐列判断
+    missing = {col: default for col, default in _REALTIME_DEFAULTS.items() if col not in realtime.columns}
+    if missing:
+        realtime = realtime.assign(**missing)
+    if (realtime['pwa_mode'] == 'offline').any():
+        raise _UncachedResult(realtime)
+    return realtime
+
+def _fetch_realtime(city):
+    """获取实时数据，10分钟内的重跑直接复用结果；离线兜底数据不缓存，网络恢复后即重新请求"""
+    try:
+        return _fetch_realtime_cached(city)
+    except _UncachedResult as e:
+        return e.data
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_forecast_cached(city, days):
+    """获取预测数据并生成日期标签，离线兜底数据通过_UncachedResult返回"""
+    forecast = _get_loader(city).get_forecast_data(days)
+    if forecast is not None and not forecast.empty:
+        # 预先生成横轴日期标签，随预测数据一起缓存
+        forecast = forecast.assign(date_label=forecast['date'].dt.strftime('%m/%d').astype('string'))
+        if (forecast['data_source'] == '离线缓存').any():
+            raise _UncachedResult(forecast)
+    return forecast
+
+def _fetch_forecast(city, days):
+    """获取预测数据，1小时内的重跑直接复用结果；离线兜底数据不缓存"""
+    try:
+        return _fetch_forecast_cached(city, days)
+    except _UncachedResult as e:
+        return e.data
+
+# ===== 天气快照 =====
+WeatherSnapshot = namedtuple(
+    'WeatherSnapshot', 'temp humidity pressure wind_speed wind_gusts uv_index apparent'
+)
+
+def make_weather_snapshot(data):
+    """从实时数据的第一行一次性提取渲染所需的天气指标（缺失列已由_fetch_realtime补齐）"""
+    row = data.iloc[0]
+    return WeatherSnapshot(
+        temp=row['temperature'],
+        humidity=row['humidity'],
+        pressure=row['pressure'],
+        wind_speed=row['wind_speed'],
+        wind_gusts=row['wind_gusts'],
+        uv_index=row['uv_index'],
+        apparent=row['apparent_temperature'],
+    )
+
+# ===== 疾病风险计算 =====
+DISEASE_KEYS = ('joint_pain', 'rhinitis', 'asthma', 'skin_disease', 'cardiovascular')
+
+# 各疾病达到高/中风险所需的评分（顺序与DISEASE_KEYS一致）
+_HIGH_THRESHOLDS = np.array([3, 2, 3, 3, 3])[:, None]
+_MEDIUM_THRESHOLDS = _HIGH_THRESHOLDS - 1
+
+# 风险等级编码：0=低, 1=中, 2=高
+RISK_LEVELS = np.array(['low', 'medium', 'high'])
+
+# 疾病风险结果（结构数组）：各字段为按DISEASE_KEYS顺序排列的等长数组
+RiskResult = namedtuple('RiskResult', 'names scores ranks levels')
+
+def score_disease_risks(temp, humidity, pressure, wind_speed, uv_index, apparent):
+    """
+    向量化计算疾病风险评分
+
+    参数均为等长数组（每个元素对应一条天气记录），返回形状为
+    (疾病数, 记录数) 的评分、等级编码和风险等级数组
+    """
+    joint = 2 * (humidity > 80) + (np.abs(temp - 20) > 10) + (pressure < 1000)
+    rhinitis = 2 * (wind_speed > 5) + ((humidity < 30) | (humidity > 70))
+    asthma = 2 * (humidity > 80) + ((temp < 10) | (temp > 30)) + (wind_speed > 8)
+    skin = 2 * (uv_index >= 6) + (humidity > 80) + (temp > 28)
+    cardio = (np.select([temp < 10, temp < 15], [2, 1], default=0)
+              + (pressure < 1000) + (np.abs(temp - apparent) > 3))
+    
+    scores = np.stack([joint, rhinitis, asthma, skin, cardio]).astype(int)
+    ranks = np.select([scores >= _HIGH_THRESHOLDS, scores >= _MEDIUM_THRESHOLDS], [2, 1], default=0)
+    return scores, ranks, RISK_LEVELS[ranks]
+
+# ===== 图表构建 =====
+# 图表对象按输入缓存，输入不变的重跑直接复用已构建的Figure
+_PIE_LABELS = ['高风险', '中风险', '低风险']
+_PIE_COLORS = ['#ff4444', '#ff9800', '#4caf50']
+_PIE_LAYOUT = dict(showlegend=True, height=250, margin=dict(l=20, r=20, t=30, b=20))
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _risk_pie_figure(high, medium, low):
+    """健康风险分布饼图"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Pie(values=[high, medium, low], labels=_PIE_LABELS, marker_colors=_PIE_COLORS))
+    fig.update_layout(**_PIE_LAYOUT)
+    
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _temperature_indicator_figure(temp, feels_like):
+    """实际温度与体感温度指示图"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+
+    fig.add_trace(go.Indicator(
+        mode = "number+delta",
+        value = temp,
+        number = {'suffix': "°C", "font": {"size": 30}},
+        delta = {'reference': feels_like, 'relative': False, 'position': "top"},
+        title = {"text": "实际温度<br><span style='font-size:0.8em;color:gray'>体感" + f"{feels_like:.1f}°C</span>"},
+        domain = {'x': [0, 1], 'y': [0, 1]}
+    ))
+
+    fig.update_layout(height=150)
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _wind_indicator_figure(wind_speed, wind_gusts):
+    """风速与阵风指示图"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+
+    fig.add_trace(go.Indicator(
+        mode = "number+gauge",
+        value = wind_speed,
+        number = {'suffix': "m/s", "font": {"size": 30}},
+        gauge = {
+            'shape': "bullet",
+            'axis': {'range': [0, 15]},
+            'bar': {'color': "darkblue"},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 5], 'color': "lightgreen"},
+                {'range': [5, 10], 'color': "yellow"},
+                {'range': [10, 15], 'color': "red"}]
+        },
+        title = {"text": "风速<br><span style='font-size:0.8em;color:gray'>阵风" + f"{wind_gusts:.1f}m/s</span>"},
+        domain = {'x': [0, 1], 'y': [0, 1]}
+    ))
+
+    fig.update_layout(height=150)
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _forecast_figure(prediction_data):
+    """未来几天最高/最低温度趋势图"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    x = prediction_data['date_label'].to_numpy()
+
+    # 长序列（如逐小时预测）先用LTTB降采样，再发送到浏览器
+    if len(prediction_data) > _RESAMPLE_THRESHOLD:
+        try:
+            from plotly_resampler import FigureResampler
+            fig = FigureResampler(fig, default_n_shown_samples=_RESAMPLE_THRESHOLD)
+            x = prediction_data['date'].to_numpy()
+        except ImportError:
+            pass
+
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=prediction_data['temperature_2m_max'].to_numpy(),
+        name='最高温度',
+        line=dict(color='red', width=2),
+        mode='lines+markers'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=prediction_data['temperature_2m_min'].to_numpy(),
+        name='最低温度',
+        line=dict(color='blue', width=2),
+        mode='lines+markers'
+    ))
+
+    fig.update_layout(
+        height=200,
+        margin=dict(l=20, r=20, t=30, b=20),
+        showlegend=True,
+        xaxis_title="日期",
+        yaxis_title="温度 (°C)"
+    )
+
+    return fig
+
+# ===== PWA静态资源 =====
+_PWA_HTML = """
     <!-- PWA配置 -->
     <link rel="manifest" href="/manifest.json">
     <meta name="theme-color" content="#764ba2">
@@ -31,12 +240,10 @@ def add_pwa_assets():
     
     <!-- Android支持 -->
     <meta name="mobile-web-app-capable" content="yes">
-    """
-    return pwa_html
+"""
 
-def register_service_worker():
-    """注册Service Worker的JavaScript代码"""
-    sw_js = """
+# 注册Service Worker的JavaScript代码
+_SW_JS = """
     <script>
         // 注册Service Worker
         if ('serviceWorker' in navigator) {
@@ -56,24 +263,21 @@ def register_service_worker():
             });
         }
         
-        // 处理PWA安装提示
-        let deferredPrompt;
-        window.addEventListener('beforeinstallprompt', (e) => {
-            e.preventDefault();
-            deferredPrompt = e;
-            
-            // 可以在这里显示安装按钮
-            setTimeout(() => {
-                if (deferredPrompt && window.innerWidth < 768) {
-                    showInstallPrompt();
-                }
-            }, 3000);
-        });
+        // 提示元素只创建一次，之后仅切换显示状态
+        let installBtn, offlineMsg, reconnectMsg;
         
-        // 显示安装提示
-        function showInstallPrompt() {
-            const installBtn = document.createElement('div');
-            installBtn.innerHTML = `
+        function createHiddenElement(html) {
+            const el = document.createElement('div');
+            el.innerHTML = html;
+            el.style.display = 'none';
+            document.body.appendChild(el);
+            return el;
+        }
+        
+        function ensurePromptElements() {
+            if (installBtn) return;
+            
+            installBtn = createHiddenElement(`
                 <div style="
                     position: fixed;
                     bottom: 80px;
@@ -92,26 +296,84 @@ def register_service_worker():
                 ">
                     📱 安装应用
                 </div>
-            `;
-            
+            `);
             installBtn.onclick = () => {
+                if (!deferredPrompt) return;
                 deferredPrompt.prompt();
                 deferredPrompt.userChoice.then((choiceResult) => {
                     if (choiceResult.outcome === 'accepted') {
                         console.log('✅ 用户同意安装');
                     }
                     deferredPrompt = null;
-                    installBtn.remove();
+                    installBtn.style.display = 'none';
                 });
             };
             
-            document.body.appendChild(installBtn);
+            offlineMsg = createHiddenElement(`
+                <div style="
+                    position: fixed;
+                    top: 10px;
+                    right: 10px;
+                    background: #ff9800;
+                    color: white;
+                    padding: 10px 15px;
+                    border-radius: 5px;
+                    z-index: 10000;
+                    font-size: 12px;
+                    box-shadow: 0 2px 5px rgba(0,0,0,0.2);
+                ">
+                    📶 网络已断开，使用离线数据
+                </div>
+            `);
+            offlineMsg.id = 'offline-message';
+            
+            reconnectMsg = createHiddenElement(`
+                <div style="
+                    position: fixed;
+                    top: 10px;
+                    right: 10px;
+                    background: #4caf50;
+                    color: white;
+                    padding: 10px 15px;
+                    border-radius: 5px;
+                    z-index: 10000;
+                    font-size: 12px;
+                    box-shadow: 0 2px 5px rgba(0,0,0,0.2);
+                    animation: fadeOut 2s forwards 2s;
+                ">
+                    ✅ 网络已恢复
+                </div>
+            `);
+        }
+        
+        if (document.readyState === 'loading') {
+            document.addEventListener('DOMContentLoaded', ensurePromptElements);
+        } else {
+            ensurePromptElements();
+        }
+        
+        // 处理PWA安装提示
+        let deferredPrompt;
+        window.addEventListener('beforeinstallprompt', (e) => {
+            e.preventDefault();
+            deferredPrompt = e;
             
-            // 10秒后自动隐藏
+            // 可以在这里显示安装按钮
             setTimeout(() => {
-                if (document.body.contains(installBtn)) {
-                    installBtn.remove();
+                if (deferredPrompt && window.innerWidth < 768) {
+                    showInstallPrompt();
                 }
+            }, 3000);
+        });
+        
+        // 显示安装提示
+        function showInstallPrompt() {
+            ensurePromptElements();
+            installBtn.style.display = 'block';
+            
+            // 10秒后自动隐藏
+            setTimeout(() => {
+                installBtn.style.display = 'none';
             }, 10000);
         }
         
@@ -127,57 +389,25 @@ def register_service_worker():
         });
         
         function showOfflineMessage() {
-            let msg = document.getElementById('offline-message');
-            if (!msg) {
-                msg = document.createElement('div');
-                msg.id = 'offline-message';
-                msg.innerHTML = `
-                    <div style="
-                        position: fixed;
-                        top: 10px;
-                        right: 10px;
-                        background: #ff9800;
-                        color: white;
-                        padding: 10px 15px;
-                        border-radius: 5px;
-                        z-index: 10000;
-                        font-size: 12px;
-                        box-shadow: 0 2px 5px rgba(0,0,0,0.2);
-                    ">
-                        📶 网络已断开，使用离线数据
-                    </div>
-                `;
-                document.body.appendChild(msg);
-            }
+            ensurePromptElements();
+            offlineMsg.style.display = 'block';
         }
         
         function hideOfflineMessage() {
-            const msg = document.getElementById('offline-message');
-            if (msg) {
-                msg.remove();
-                
-                // 显示重新连接提示
-                const reconnectMsg = document.createElement('div');
-                reconnectMsg.innerHTML = `
-                    <div style="
-                        position: fixed;
-                        top: 10px;
-                        right: 10px;
-                        background: #4caf50;
-                        color: white;
-                        padding: 10px 15px;
-                        border-radius: 5px;
-                        z-index: 10000;
-                        font-size: 12px;
-                        box-shadow: 0 2px 5px rgba(0,0,0,0.2);
-                        animation: fadeOut 2s forwards 2s;
-                    ">
-                        ✅ 网络已恢复
-                    </div>
-                `;
-                document.body.appendChild(reconnectMsg);
-                setTimeout(() => reconnectMsg.remove(), 4000);
-            }
+            ensurePromptElements();
+            if (offlineMsg.style.display === 'none') return;
+            offlineMsg.style.display = 'none';
+            
+            // 显示重新连接提示，重置淡出动画
+            const inner = reconnectMsg.firstElementChild;
+            inner.style.animation = 'none';
+            void inner.offsetWidth;
+            inner.style.animation = '';
+            reconnectMsg.style.display = 'block';
+            clearTimeout(reconnectMsg.hideTimer);
+            reconnectMsg.hideTimer = setTimeout(() => {
+                reconnectMsg.style.display = 'none';
+            }, 4000);
         }
         
         // 检测是否已安装
@@ -192,11 +422,10 @@ def register_service_worker():
             to { opacity: 0; }
         }
     </style>
-    """
-    return sw_js
+"""
 
 # ===== 简洁的CSS样式 =====
-st.markdown("""
+_CSS_BLOCK = """
 <style>
     .main-header {
         font-size: 2.2rem;
@@ -219,15 +448,6 @@ st.markdown("""
     .health-high { border-left-color: #ff4444; background: #ffebee; }
     .health-medium { border-left-color: #ff9800; background: #fff3e0; }
     .health-low { border-left-color: #4caf50; background: #e8f5e8; }
-    .metric-card {
-        background: white;
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 0.3rem;
-        text-align: center;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-    }
     .section-title {
         background: #f8f9fa;
         padding: 0.8rem;
@@ -268,7 +488,39 @@ st.markdown("""
         box-shadow: 0 4px 8px rgba(102, 126, 234, 0.4);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# 关键指标数值颜色，按列序号定位原生st.metric
+_METRIC_COLOR_CSS = (
+    'div[data-testid="column"]:nth-of-type({index}) '
+    '[data-testid="stMetricValue"] {{ color: {color}; }}'
+)
+
+# 关键指标分档：阈值（左闭右开）及各档对应的状态和颜色
+_TEMP_BINS = np.array([10, 18, 26])
+_TEMP_STATUS = ('寒冷', '凉爽', '舒适', '炎热')
+_TEMP_COLOR = ('#2196F3', '#4CAF50', '#4CAF50', '#FF9800')
+_HUMIDITY_BINS = np.array([40, 70])
+_HUMIDITY_STATUS = ('干燥', '舒适', '潮湿')
+_HUMIDITY_COLOR = ('#FF9800', '#4CAF50', '#2196F3')
+_UV_BINS = np.array([3, 6])
+_UV_STATUS = ('弱', '中等', '强')
+_UV_COLOR = ('#4CAF50', '#FF9800', '#F44336')
+_RISK_BINS = np.array([1.5, 2.5])
+_RISK_STATUS = ('低', '中', '高')
+_RISK_COLOR = ('#4CAF50', '#FF9800', '#F44336')
+
+# 疾病卡片风险条颜色，按风险等级编码索引
+_RISK_BAR_COLORS = ('#4caf50', '#ff9800', '#f44336')
+
+def _bucket(bins, value):
+    """返回value所在分档的序号"""
+    return int(np.searchsorted(bins, value, side='right'))
+
+# 预测曲线超过该点数时在服务端降采样（需要安装plotly-resampler）
+_RESAMPLE_THRESHOLD = 1000
+
+st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
 
 class SimpleVisualWeatherApp:
     """
@@ -278,14 +530,12 @@ class SimpleVisualWeatherApp:
     def __init__(self):
         """初始化应用"""
         self.weather_loader = None
-        self.current_city = None
-        self.data_loaded = False
         
     def run(self):
         """运行简洁可视化天气应用的主方法"""
-        # 添加PWA资源
-        st.markdown(add_pwa_assets(), unsafe_allow_html=True)
-        st.markdown(register_service_worker(), unsafe_allow_html=True)
+        # 添加PWA资源（每次重跑都需输出，未重新输出的元素会被Streamlit移除）
+        st.markdown(_PWA_HTML, unsafe_allow_html=True)
+        st.markdown(_SW_JS, unsafe_allow_html=True)
         
         # 应用标题
         st.markdown('<div class="main-header">🏞️ 贵州天气健康分析 📱</div>', unsafe_allow_html=True)
@@ -339,8 +589,7 @@ class SimpleVisualWeatherApp:
     def create_city_selector(self):
         """创建城市选择器"""
         st.sidebar.title("📍 选择城市")
-        guizhou_cities = ["贵阳市", "毕节市", "遵义市", "六盘水市", "安顺市"]
-        selected_city = st.sidebar.selectbox("", guizhou_cities, key="city_selector")
+        selected_city = st.sidebar.selectbox("", list(GUIZHOU_CITIES), key="city_selector")
         
         st.sidebar.markdown("---")
         st.sidebar.info("""
@@ -358,48 +607,49 @@ class SimpleVisualWeatherApp:
         """
         初始化真实数据加载器
         """
-        if not self.data_loaded or self.current_city != city:
-            try:
-                with st.spinner(f'正在加载{city}数据...'):
-                    from data_sources import RealWeatherDataLoader
-                    self.weather_loader = RealWeatherDataLoader(city)
-                    self.current_city = city
-                    self.data_loaded = True
-                    st.success(f"✅ {city} 数据加载完成")
-            except Exception as e:
-                st.error(f"❌ 数据加载失败: {e}")
-                self.data_loaded = False
+        try:
+            with st.spinner(f'正在加载{city}数据...'):
+                self.weather_loader = _get_loader(city)
+                st.success(f"✅ {city} 数据加载完成")
+        except Exception as e:
+            st.error(f"❌ 数据加载失败: {e}")
+            self.weather_loader = None
     
     def show_main_dashboard(self, city):
         """
         显示主仪表盘 - 简洁直观
         """
-        if not self.data_loaded or not self.weather_loader:
+        if not self.weather_loader:
             st.error("🔧 数据加载中...")
             return
         
         # 获取实时数据
         with st.spinner('正在获取最新天气数据...'):
             try:
-                realtime_data = self.weather_loader.get_realtime_data()
+                realtime_data = _fetch_realtime(city)
                 
                 # 显示数据更新时间
-                if 'update_time' in realtime_data.columns:
-                    update_time = realtime_data['update_time'].iloc[0]
-                    if isinstance(update_time, pd.Timestamp):
-                        st.caption(f"📅 数据更新时间: {update_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                update_time = realtime_data['update_time'].iloc[0] if 'update_time' in realtime_data.columns else None
+                if isinstance(update_time, pd.Timestamp):
+                    st.caption(f"📅 数据更新时间: {update_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                # 渲染指纹：城市和数据更新时间不变时，纯HTML内容可直接复用
+                sig = (city, update_time)
+                
+                snap = make_weather_snapshot(realtime_data)
+                diseases_risk = self.calculate_disease_risks(snap)
                 
                 # 顶部关键指标
-                self.display_key_metrics(realtime_data, city)
+                self.display_key_metrics(snap, diseases_risk, city)
                 
                 # 健康风险概览
-                self.display_health_overview(realtime_data)
+                self.display_health_overview(diseases_risk)
                 
                 # 天气详情
-                self.display_weather_details(realtime_data)
+                self.display_weather_details(snap)
                 
                 # 疾病风险详情
-                self.display_disease_details(realtime_data)
+                self.display_disease_details(snap, diseases_risk, sig)
                 
                 # 预测信息
                 self.display_forecast_info(city)
@@ -407,91 +657,48 @@ class SimpleVisualWeatherApp:
             except Exception as e:
                 st.error(f"❌ 数据获取失败: {e}")
     
-    def display_key_metrics(self, data, city):
+    def display_key_metrics(self, snap, diseases_risk, city):
         """显示关键指标"""
         st.markdown(f'<div class="section-title">📊 {city} - 今日关键指标</div>', unsafe_allow_html=True)
         
         col1, col2, col3, col4 = st.columns(4)
         
-        with col1:
-            temp = data['temperature'].iloc[0]
-            temp_status = "寒冷" if temp < 10 else "凉爽" if temp < 18 else "舒适" if temp < 26 else "炎热"
-            temp_color = "#2196F3" if temp < 10 else "#4CAF50" if temp < 26 else "#FF9800"
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 1.2rem; color: {temp_color}; font-weight: bold;">{temp:.1f}°C</div>
-                <div style="font-size: 0.8rem; color: #666;">🌡️ 温度</div>
-                <div style="font-size: 0.7rem; color: #888;">{temp_status}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            humidity = data['humidity'].iloc[0]
-            humidity_status = "干燥" if humidity < 40 else "舒适" if humidity < 70 else "潮湿"
-            humidity_color = "#FF9800" if humidity < 40 else "#4CAF50" if humidity < 70 else "#2196F3"
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 1.2rem; color: {humidity_color}; font-weight: bold;">{humidity:.0f}%</div>
-                <div style="font-size: 0.8rem; color: #666;">💧 湿度</div>
-                <div style="font-size: 0.7rem; color: #888;">{humidity_status}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            uv_index = data['uv_index'].iloc[0] if 'uv_index' in data.columns else 0
-            uv_status = "弱" if uv_index < 3 else "中等" if uv_index < 6 else "强"
-            uv_color = "#4CAF50" if uv_index < 3 else "#FF9800" if uv_index < 6 else "#F44336"
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 1.2rem; color: {uv_color}; font-weight: bold;">{uv_index}</div>
-                <div style="font-size: 0.8rem; color: #666;">☀️ 紫外线</div>
-                <div style="font-size: 0.7rem; color: #888;">{uv_status}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            # 计算总体健康风险
-            diseases_risk = self.calculate_disease_risks(data)
-            max_risk = max([risk['score'] for risk in diseases_risk.values()])
-            overall_risk = "高" if max_risk >= 2.5 else "中" if max_risk >= 1.5 else "低"
-            risk_color = "#F44336" if overall_risk == "高" else "#FF9800" if overall_risk == "中" else "#4CAF50"
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 1.2rem; color: {risk_color}; font-weight: bold;">{overall_risk}</div>
-                <div style="font-size: 0.8rem; color: #666;">❤️ 健康风险</div>
-                <div style="font-size: 0.7rem; color: #888;">总体评估</div>
-            </div>
-            """, unsafe_allow_html=True)
+        temp = snap.temp
+        i = _bucket(_TEMP_BINS, temp)
+        temp_status, temp_color = _TEMP_STATUS[i], _TEMP_COLOR[i]
+        col1.metric("🌡️ 温度", f"{temp:.1f}°C", delta=temp_status, delta_color="off")
+        
+        humidity = snap.humidity
+        i = _bucket(_HUMIDITY_BINS, humidity)
+        humidity_status, humidity_color = _HUMIDITY_STATUS[i], _HUMIDITY_COLOR[i]
+        col2.metric("💧 湿度", f"{humidity:.0f}%", delta=humidity_status, delta_color="off")
+        
+        uv_index = snap.uv_index
+        i = _bucket(_UV_BINS, uv_index)
+        uv_status, uv_color = _UV_STATUS[i], _UV_COLOR[i]
+        col3.metric("☀️ 紫外线", f"{uv_index}", delta=uv_status, delta_color="off")
+        
+        # 总体健康风险
+        max_risk = diseases_risk.scores.max()
+        i = _bucket(_RISK_BINS, max_risk)
+        overall_risk, risk_color = _RISK_STATUS[i], _RISK_COLOR[i]
+        col4.metric("❤️ 健康风险", overall_risk, delta="总体评估", delta_color="off")
+        
+        # 数值颜色随状态变化
+        colors = (temp_color, humidity_color, uv_color, risk_color)
+        st.markdown('<style>' + ''.join(
+            _METRIC_COLOR_CSS.format(index=i, color=color) for i, color in enumerate(colors, 1)
+        ) + '</style>', unsafe_allow_html=True)
     
-    def display_health_overview(self, data):
+    def display_health_overview(self, diseases_risk):
         """显示健康风险概览"""
         st.markdown('<div class="section-title">🎯 今日健康风险概览</div>', unsafe_allow_html=True)
         
-        diseases_risk = self.calculate_disease_risks(data)
-        
         # 创建风险分布图
-        risk_counts = {'高风险': 0, '中风险': 0, '低风险': 0}
-        for risk_data in diseases_risk.values():
-            if risk_data['level'] == 'high':
-                risk_counts['高风险'] += 1
-            elif risk_data['level'] == 'medium':
-                risk_counts['中风险'] += 1
-            else:
-                risk_counts['低风险'] += 1
-        
-        fig = px.pie(
-            values=list(risk_counts.values()),
-            names=list(risk_counts.keys()),
-            color=list(risk_counts.keys()),
-            color_discrete_map={'高风险': '#ff4444', '中风险': '#ff9800', '低风险': '#4caf50'}
-        )
-        
-        fig.update_layout(
-            showlegend=True,
-            height=250,
-            margin=dict(l=20, r=20, t=30, b=20)
-        )
+        counts = np.bincount(diseases_risk.ranks, minlength=3)
+        risk_counts = dict(zip(['低风险', '中风险', '高风险'], counts.tolist()))
         
+        fig = _risk_pie_figure(risk_counts['高风险'], risk_counts['中风险'], risk_counts['低风险'])
         st.plotly_chart(fig, use_container_width=True)
         
         # 简要提示
@@ -502,7 +709,7 @@ class SimpleVisualWeatherApp:
         else:
             st.success("✅ 今日所有疾病风险均较低，适合户外活动")
     
-    def display_weather_details(self, data):
+    def display_weather_details(self, snap):
         """显示天气详情"""
         st.markdown('<div class="section-title">🌤️ 天气详情</div>', unsafe_allow_html=True)
         
@@ -510,21 +717,10 @@ class SimpleVisualWeatherApp:
         
         with col1:
             # 温度体感分析
-            temp = data['temperature'].iloc[0]
-            feels_like = data['apparent_temperature'].iloc[0]
-            
-            fig = go.Figure()
+            temp = snap.temp
+            feels_like = snap.apparent
             
-            fig.add_trace(go.Indicator(
-                mode = "number+delta",
-                value = temp,
-                number = {'suffix': "°C", "font": {"size": 30}},
-                delta = {'reference': feels_like, 'relative': False, 'position': "top"},
-                title = {"text": "实际温度<br><span style='font-size:0.8em;color:gray'>体感" + f"{feels_like:.1f}°C</span>"},
-                domain = {'x': [0, 1], 'y': [0, 1]}
-            ))
-            
-            fig.update_layout(height=150)
+            fig = _temperature_indicator_figure(float(temp), float(feels_like))
             st.plotly_chart(fig, use_container_width=True)
             
             # 温度建议
@@ -533,50 +729,34 @@ class SimpleVisualWeatherApp:
         
         with col2:
             # 风力信息
-            wind_speed = data['wind_speed'].iloc[0] if 'wind_speed' in data.columns else 0
-            wind_gusts = data['wind_gusts'].iloc[0] if 'wind_gusts' in data.columns else 0
-            
-            fig = go.Figure()
-            
-            fig.add_trace(go.Indicator(
-                mode = "number+gauge",
-                value = wind_speed,
-                number = {'suffix': "m/s", "font": {"size": 30}},
-                gauge = {
-                    'shape': "bullet",
-                    'axis': {'range': [0, 15]},
-                    'bar': {'color': "darkblue"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "gray",
-                    'steps': [
-                        {'range': [0, 5], 'color': "lightgreen"},
-                        {'range': [5, 10], 'color': "yellow"},
-                        {'range': [10, 15], 'color': "red"}]
-                },
-                title = {"text": "风速<br><span style='font-size:0.8em;color:gray'>阵风" + f"{wind_gusts:.1f}m/s</span>"},
-                domain = {'x': [0, 1], 'y': [0, 1]}
-            ))
+            wind_speed = snap.wind_speed
+            wind_gusts = snap.wind_gusts
             
-            fig.update_layout(height=150)
+            fig = _wind_indicator_figure(float(wind_speed), float(wind_gusts))
             st.plotly_chart(fig, use_container_width=True)
             
             # 风力建议
             if wind_speed > 8:
                 st.warning("💨 风力较大，建议减少户外活动")
     
-    def display_disease_details(self, data):
+    def display_disease_details(self, snap, diseases_risk, sig):
         """显示疾病风险详情"""
         st.markdown('<div class="section-title">🩺 疾病风险详情</div>', unsafe_allow_html=True)
         
-        diseases_risk = self.calculate_disease_risks(data)
+        # 输入未变化时直接复用上次生成的卡片
+        if st.session_state.get('_last_sig') == sig and '_last_html' in st.session_state:
+            for card_html in st.session_state['_last_html']:
+                st.markdown(card_html, unsafe_allow_html=True)
+            return
         
-        # 按风险等级排序
-        sorted_diseases = sorted(diseases_risk.items(), 
-                               key=lambda x: {'high': 3, 'medium': 2, 'low': 1}[x[1]['level']], 
-                               reverse=True)
+        cards = []
         
-        for disease, risk_data in sorted_diseases:
+        # 按风险等级排序（稳定排序，同等级保持原顺序）
+        for i in np.argsort(-diseases_risk.ranks, kind='stable'):
+            disease = diseases_risk.names[i]
+            level = diseases_risk.levels[i]
+            score = diseases_risk.scores[i]
+            
             disease_name = {
                 'joint_pain': '🦵 关节痛',
                 'rhinitis': '👃 过敏性鼻炎',
@@ -585,35 +765,41 @@ class SimpleVisualWeatherApp:
                 'cardiovascular': '❤️ 心脑血管疾病'
             }[disease]
             
-            risk_class = f"health-{risk_data['level']}"
-            risk_badge_class = f"risk-{risk_data['level']}"
+            risk_class = f"health-{level}"
+            risk_badge_class = f"risk-{level}"
+            bar_color = _RISK_BAR_COLORS[diseases_risk.ranks[i]]
             
             # 获取具体建议
-            advice = self.get_disease_advice(disease, risk_data, data)
+            advice = self.get_disease_advice(disease, level, snap)
             
-            st.markdown(f"""
+            cards.append(f"""
             <div class="health-card {risk_class}">
                 <div style="display: flex; justify-content: between; align-items: center;">
                     <div style="font-weight: bold; font-size: 1.1rem;">{disease_name}</div>
-                    <span class="risk-badge {risk_badge_class}">{risk_data['level'].upper()}风险</span>
+                    <span class="risk-badge {risk_badge_class}">{level.upper()}风险</span>
                 </div>
                 <div style="margin-top: 0.5rem; font-size: 0.9rem; color: #555;">
                     {advice}
                 </div>
                 <div style="margin-top: 0.5rem;">
                     <div style="background: #e0e0e0; border-radius: 5px; height: 6px;">
-                        <div style="width: {risk_data['score']/3*100}%; 
-                                  background: {'#f44336' if risk_data['level'] == 'high' else '#ff9800' if risk_data['level'] == 'medium' else '#4caf50'}; 
+                        <div style="width: {score/3*100}%; 
+                                  background: {bar_color}; 
                                   height: 6px; border-radius: 5px;"></div>
                     </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+        
+        st.session_state['_last_sig'] = sig
+        st.session_state['_last_html'] = cards
+        for card_html in cards:
+            st.markdown(card_html, unsafe_allow_html=True)
     
-    def get_disease_advice(self, disease, risk_data, weather_data):
+    def get_disease_advice(self, disease, level, snap):
         """获取疾病建议"""
-        temp = weather_data['temperature'].iloc[0]
-        humidity = weather_data['humidity'].iloc[0]
+        temp = snap.temp
+        humidity = snap.humidity
         
         advice_map = {
             'joint_pain': {
@@ -643,45 +829,18 @@ class SimpleVisualWeatherApp:
             }
         }
         
-        return advice_map[disease][risk_data['level']]
+        return advice_map[disease][level]
     
     def display_forecast_info(self, city):
         """显示预测信息"""
         st.markdown('<div class="section-title">📅 未来3天趋势</div>', unsafe_allow_html=True)
         
         try:
-            from data_sources import RealWeatherDataLoader
-            loader = RealWeatherDataLoader(city)
-            prediction_data = loader.get_forecast_data(3)
+            prediction_data = _fetch_forecast(city, 3)
             
             if prediction_data is not None and not prediction_data.empty:
                 # 创建简单的趋势图
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatter(
-                    x=prediction_data['date'].dt.strftime('%m/%d'),
-                    y=prediction_data['temperature_2m_max'],
-                    name='最高温度',
-                    line=dict(color='red', width=2),
-                    mode='lines+markers'
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=prediction_data['date'].dt.strftime('%m/%d'),
-                    y=prediction_data['temperature_2m_min'],
-                    name='最低温度',
-                    line=dict(color='blue', width=2),
-                    mode='lines+markers'
-                ))
-                
-                fig.update_layout(
-                    height=200,
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    showlegend=True,
-                    xaxis_title="日期",
-                    yaxis_title="温度 (°C)"
-                )
-                
+                fig = _forecast_figure(prediction_data)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # 简要趋势分析
@@ -699,124 +858,18 @@ class SimpleVisualWeatherApp:
         except Exception as e:
             st.info("🔮 预测信息暂不可用")
     
-    def calculate_disease_risks(self, data):
+    def calculate_disease_risks(self, snap):
         """
         计算各种疾病风险
         """
-        temp = data['temperature'].iloc[0]
-        humidity = data['humidity'].iloc[0]
-        pressure = data['pressure'].iloc[0] if 'pressure' in data.columns else 1013
-        wind_speed = data['wind_speed'].iloc[0] if 'wind_speed' in data.columns else 0
-        uv_index = data['uv_index'].iloc[0] if 'uv_index' in data.columns else 0
-        
-        diseases_risk = {}
-        
-        # 关节痛风险
-        joint_risk_score = 0
-        if humidity > 80:
-            joint_risk_score += 2
-        if abs(temp - 20) > 10:
-            joint_risk_score += 1
-        if pressure < 1000:
-            joint_risk_score += 1
-            
-        if joint_risk_score >= 3:
-            joint_level = "high"
-        elif joint_risk_score >= 2:
-            joint_level = "medium"
-        else:
-            joint_level = "low"
-        
-        diseases_risk['joint_pain'] = {
-            'level': joint_level,
-            'score': joint_risk_score
-        }
-        
-        # 过敏性鼻炎风险
-        rhinitis_risk_score = 0
-        if wind_speed > 5:
-            rhinitis_risk_score += 2
-        if humidity < 30 or humidity > 70:
-            rhinitis_risk_score += 1
-            
-        if rhinitis_risk_score >= 2:
-            rhinitis_level = "high"
-        elif rhinitis_risk_score >= 1:
-            rhinitis_level = "medium"
-        else:
-            rhinitis_level = "low"
-        
-        diseases_risk['rhinitis'] = {
-            'level': rhinitis_level,
-            'score': rhinitis_risk_score
-        }
-        
-        # 哮喘风险
-        asthma_risk_score = 0
-        if humidity > 80:
-            asthma_risk_score += 2
-        if temp < 10 or temp > 30:
-            asthma_risk_score += 1
-        if wind_speed > 8:
-            asthma_risk_score += 1
-            
-        if asthma_risk_score >= 3:
-            asthma_level = "high"
-        elif asthma_risk_score >= 2:
-            asthma_level = "medium"
-        else:
-            asthma_level = "low"
-        
-        diseases_risk['asthma'] = {
-            'level': asthma_level,
-            'score': asthma_risk_score
-        }
-        
-        # 皮肤敏感风险
-        skin_risk_score = 0
-        if uv_index >= 6:
-            skin_risk_score += 2
-        if humidity > 80:
-            skin_risk_score += 1
-        if temp > 28:
-            skin_risk_score += 1
-            
-        if skin_risk_score >= 3:
-            skin_level = "high"
-        elif skin_risk_score >= 2:
-            skin_level = "medium"
-        else:
-            skin_level = "low"
-        
-        diseases_risk['skin_disease'] = {
-            'level': skin_level,
-            'score': skin_risk_score
-        }
-        
-        # 心脑血管疾病风险
-        cardio_risk_score = 0
-        if temp < 10:
-            cardio_risk_score += 2
-        elif temp < 15:
-            cardio_risk_score += 1
-        if pressure < 1000:
-            cardio_risk_score += 1
-        if abs(temp - data['apparent_temperature'].iloc[0]) > 3:
-            cardio_risk_score += 1
-            
-        if cardio_risk_score >= 3:
-            cardio_level = "high"
-        elif cardio_risk_score >= 2:
-            cardio_level = "medium"
-        else:
-            cardio_level = "low"
-        
-        diseases_risk['cardiovascular'] = {
-            'level': cardio_level,
-            'score': cardio_risk_score
-        }
+        # 每个指标转为长度为1的数组，复用向量化评分
+        values = WeatherSnapshot(*np.array(snap, dtype=float)[:, None])
+        scores, ranks, levels = score_disease_risks(
+            values.temp, values.humidity, values.pressure,
+            values.wind_speed, values.uv_index, values.apparent
+        )
         
-        return diseases_risk
+        return RiskResult(DISEASE_KEYS, scores[:, 0], ranks[:, 0], levels[:, 0])
     
     def create_footer(self):
         """
@@ -0,0 +1,121 @@
+"""
+Open-Meteo数据加载基础模块 - PWA版本
+实时与预测数据加载器共用的HTTP会话、缓存、天气代码映射和请求逻辑
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import niquests
+import pandas as pd
+import openmeteo_requests
+import requests
+import requests_cache
+from cachetools import TLRUCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cities import get_city_info
+
+# 模块级日志记录器，城市名通过extra传入
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+API_URL = "https://api.open-meteo.com/v1/forecast"
+TIMEZONE = "Asia/Shanghai"
+
+# 带本地缓存的HTTP会话，所有加载器共用；过期时间由各加载器按请求指定
+session = requests_cache.CachedSession('.cache.sqlite', expire_after=300)
+
+# 连接池复用已建立的TLS连接；连接失败和网关错误自动重试
+session.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
+# 请求超时：连接3秒，读取10秒
+REQUEST_TIMEOUT = (3, 10)
+
+# Open-Meteo客户端：FlatBuffers格式响应，数值直接读取为NumPy数组
+openmeteo = openmeteo_requests.Client(session=session)
+
+# 网络不可达类错误：只有这些错误才视为离线（同步会话基于requests，异步客户端基于niquests）
+NETWORK_ERRORS = (
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+    niquests.exceptions.ConnectionError, niquests.exceptions.Timeout
+)
+
+# 各类缓存条目的有效期（秒），键的第一个元素为条目类型
+_CACHE_TTL = {
+    'realtime': 300,    # 实时数据：在线时5分钟有效
+    'offline': 3600,    # 最近一次成功的实时数据：离线时1小时内可用
+    'forecast': 3600    # 预测数据：1小时
+}
+
+# 进程级数据缓存：所有加载器实例共享，按条目类型设置过期时间
+_CACHE = TLRUCache(maxsize=512, ttu=lambda key, value, now: now + _CACHE_TTL[key[0]])
+_CACHE_LOCK = threading.Lock()
+
+# 天气代码到中文描述的映射
+_WEATHER_MAP = {
+    0: "晴", 1: "主要晴", 2: "局部多云", 3: "多云",
+    45: "雾", 48: "雾",
+    51: "小雨", 53: "中雨", 55: "大雨",
+    61: "小雨", 63: "中雨", 65: "大雨",
+    80: "阵雨", 81: "中阵雨", 82: "强阵雨",
+    95: "雷暴", 96: "雷暴", 99: "强雷暴"
+}
+
+class OpenMeteoLoader(ABC):
+    """
+    Open-Meteo数据加载器基类
+    
+    子类声明request_params（current或daily变量列表）并实现_build_df
+    """
+    
+    # 子类覆盖：请求参数和本地HTTP缓存过期秒数
+    request_params: Dict = {}
+    http_expire_after = 300
+    
+    def __init__(self, city: str):
+        """
+        初始化数据加载器
+        
+        Args:
+            city: 城市名称
+        """
+        self.city = city
+        self.city_info = get_city_info(city)
+    
+    @classmethod
+    def _build_params(cls, loaders: List["OpenMeteoLoader"], **params) -> Dict:
+        """构建多坐标请求参数，响应顺序与loaders一致"""
+        return {
+            "latitude": [loader.city_info["lat"] for loader in loaders],
+            "longitude": [loader.city_info["lon"] for loader in loaders],
+            "timezone": TIMEZONE,
+            **cls.request_params,
+            **params
+        }
+    
+    @classmethod
+    def _request(cls, loaders: List["OpenMeteoLoader"], **params) -> list:
+        """一次API请求获取多个城市的数据"""
+        return openmeteo.weather_api(
+            API_URL, params=cls._build_params(loaders, **params),
+            timeout=REQUEST_TIMEOUT, expire_after=cls.http_expire_after
+        )
+    
+    @abstractmethod
+    def _build_df(self, response) -> Optional[pd.DataFrame]:
+        """将单个城市的API响应转换为DataFrame，响应缺少数据时返回None"""
+    
+    @staticmethod
+    def _map_weather(codes) -> pd.Series:
+        """批量将天气代码转换为中文描述"""
+        return pd.Series(codes).map(_WEATHER_MAP).fillna("未知")
+    
+    def _get_weather_condition_chinese(self, weather_code: int) -> str:
+        """将天气代码转换为中文描述"""
+        return _WEATHER_MAP.get(weather_code, "未知")
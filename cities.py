@@ -0,0 +1,45 @@
+"""
+贵州城市信息模块
+实时与预测数据加载器共用的城市坐标表
+"""
+
+from typing import Dict
+
+# 贵州城市的坐标和基本信息
+GUIZHOU_CITIES = {
+    "贵阳市": {
+        "lat": 26.6470, 
+        "lon": 106.6302, 
+        "elevation": 1071,
+        "description": "贵州省会，林城"
+    },
+    "毕节市": {
+        "lat": 27.3026, 
+        "lon": 105.2840, 
+        "elevation": 1510,
+        "description": "黔西北高原城市"
+    },
+    "遵义市": {
+        "lat": 27.7064, 
+        "lon": 106.9373, 
+        "elevation": 865,
+        "description": "黔北重要城市"
+    },
+    "六盘水市": {
+        "lat": 26.5935, 
+        "lon": 104.8467, 
+        "elevation": 1850,
+        "description": "中国凉都"
+    },
+    "安顺市": {
+        "lat": 26.2537, 
+        "lon": 105.9462, 
+        "elevation": 1380,
+        "description": "黄果树瀑布所在地"
+    }
+}
+
+
+def get_city_info(city: str) -> Dict:
+    """获取城市的坐标和基本信息，未知城市使用贵阳市"""
+    return GUIZHOU_CITIES.get(city, GUIZHOU_CITIES["贵阳市"])
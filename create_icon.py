@@ -2,6 +2,7 @@
 """
 创建PWA图标的脚本
 运行: python create_icon.py
+提示: 安装 pillow-simd（Pillow 的直接替代品）可加速缩放，无需修改代码
 """
 
 from PIL import Image, ImageDraw, ImageFont
@@ -18,25 +19,26 @@ def create_pwa_icons():
     
     # 创建512×512图标
     print("🖼️ 创建512×512图标...")
-    img_512 = Image.new('RGBA', (512, 512), color=(102, 126, 234, 255))  # #667eea
+    # 图标完全不透明，使用RGB模式，缩放时少处理一个通道
+    img_512 = Image.new('RGB', (512, 512), color=(102, 126, 234))  # #667eea
     draw = ImageDraw.Draw(img_512)
     
     # 绘制中心圆形
     circle_margin = 80
     circle_coords = (circle_margin, circle_margin, 
                      512 - circle_margin, 512 - circle_margin)
-    draw.ellipse(circle_coords, fill=(255, 255, 255, 255))
+    draw.ellipse(circle_coords, fill=(255, 255, 255))
     
     # 绘制天气图标（简单的云和太阳）
     # 云朵
     cloud_coords = (180, 180, 330, 280)
-    draw.ellipse(cloud_coords, fill=(240, 248, 255, 255))
+    draw.ellipse(cloud_coords, fill=(240, 248, 255))
     cloud_coords2 = (230, 150, 380, 250)
-    draw.ellipse(cloud_coords2, fill=(240, 248, 255, 255))
+    draw.ellipse(cloud_coords2, fill=(240, 248, 255))
     
     # 太阳
     sun_coords = (360, 360, 450, 450)
-    draw.ellipse(sun_coords, fill=(255, 215, 0, 255))
+    draw.ellipse(sun_coords, fill=(255, 215, 0))
     
     # 保存512图标
     img_512.save('icon-512.png', 'PNG')
@@ -44,7 +46,8 @@ def create_pwa_icons():
     
     # 创建192×192图标（从512缩放）
     print("🖼️ 创建192×192图标...")
-    img_192 = img_512.resize((192, 192), Image.Resampling.LANCZOS)
+    img_192 = img_512.copy()
+    img_192.thumbnail((192, 192), Image.Resampling.LANCZOS)
     img_192.save('icon-192.png', 'PNG')
     print("✅ 已创建: icon-192.png")
     
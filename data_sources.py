@@ -8,6 +8,10 @@ from datetime import datetime, timedelta
 import logging
 from typing import Dict, Optional, Any
 
+# 模块级日志记录器，城市名通过extra传入
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
 class RealWeatherDataLoader:
     """
     真实天气数据加载器 - PWA版本
@@ -22,47 +26,37 @@ class RealWeatherDataLoader:
         """
         self.city = city
         self.modules = {}
-        self.module_status = {}
-        self.logger = self._setup_logger()
+        self._module_status = {}
         self._initialize_all_modules()
     
-    def _setup_logger(self) -> logging.Logger:
-        """设置日志系统"""
-        logger = logging.getLogger(f"RealDataLoader_{self.city}")
-        logger.setLevel(logging.INFO)
-        return logger
-    
     def _initialize_all_modules(self):
         """初始化所有真实数据模块"""
-        self.logger.info(f"开始初始化数据模块 - 城市: {self.city}")
+        logger.info("开始初始化数据模块 - 城市: %s", self.city, extra={"city": self.city})
         
         # 实时数据模块
         try:
             from realtime_loader import RealTimeWeatherLoader
             self.modules['realtime'] = RealTimeWeatherLoader(self.city)
-            test_data = self.modules['realtime'].get_realtime_data()
-            self.module_status['realtime'] = '✅ 实时数据'
-            self.logger.info(f"实时数据模块初始化成功")
-            
         except Exception as e:
             self.modules['realtime'] = None
-            self.module_status['realtime'] = f'❌ 实时数据: {str(e)[:50]}'
-            self.logger.error(f"实时数据模块初始化失败: {e}")
+            self._module_status['realtime'] = f'❌ 实时数据: {str(e)[:50]}'
+            logger.error("实时数据模块初始化失败: %s", e, extra={"city": self.city})
         
         # 预测数据模块
         try:
             from forecast_loader import ForecastWeatherLoader
             self.modules['forecast'] = ForecastWeatherLoader(self.city)
-            test_data = self.modules['forecast'].get_forecast_data(3)
-            self.module_status['forecast'] = '✅ 预测数据'
-            self.logger.info(f"预测数据模块初始化成功")
-            
         except Exception as e:
             self.modules['forecast'] = None
-            self.module_status['forecast'] = f'❌ 预测数据: {str(e)[:50]}'
-            self.logger.error(f"预测数据模块初始化失败: {e}")
+            self._module_status['forecast'] = f'❌ 预测数据: {str(e)[:50]}'
+            logger.error("预测数据模块初始化失败: %s", e, extra={"city": self.city})
         
-        self.logger.info(f"数据模块初始化完成 - 城市: {self.city}")
+        logger.info("数据模块初始化完成 - 城市: %s", self.city, extra={"city": self.city})
+    
+    @property
+    def module_status(self) -> Dict[str, str]:
+        """各模块状态：首次获取数据前为unknown，之后为最近一次调用的结果"""
+        return {name: self._module_status.get(name, 'unknown') for name in ('realtime', 'forecast')}
     
     def get_realtime_data(self) -> pd.DataFrame:
         """
@@ -77,7 +71,14 @@ class RealWeatherDataLoader:
         if not self.modules.get('realtime'):
             raise Exception("实时数据模块未初始化")
         
-        return self.modules['realtime'].get_realtime_data()
+        try:
+            data = self.modules['realtime'].get_realtime_data()
+        except Exception as e:
+            self._module_status['realtime'] = f'❌ 实时数据: {str(e)[:50]}'
+            raise
+        
+        self._module_status['realtime'] = '✅ 实时数据'
+        return data
     
     def get_forecast_data(self, days: int = 3, target_date: Optional[datetime] = None) -> pd.DataFrame:
         """
@@ -96,9 +97,16 @@ class RealWeatherDataLoader:
         if not self.modules.get('forecast'):
             raise Exception("预测数据模块未初始化")
         
-        return self.modules['forecast'].get_forecast_data(
-            days=days, target_date=target_date
-        )
+        try:
+            data = self.modules['forecast'].get_forecast_data(
+                days=days, target_date=target_date
+            )
+        except Exception as e:
+            self._module_status['forecast'] = f'❌ 预测数据: {str(e)[:50]}'
+            raise
+        
+        self._module_status['forecast'] = '✅ 预测数据'
+        return data
     
     def get_health_status(self) -> Dict[str, Any]:
         """
@@ -3,49 +3,34 @@
 专注于为PWA应用提供天气预测
 """
 
+import numpy as np
 import pandas as pd
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 from typing import Dict, Optional
+from cachetools import cached
+from base_loader import TIMEZONE, OpenMeteoLoader, _CACHE, _CACHE_LOCK
 
-class ForecastWeatherLoader:
+# 模块级日志记录器，城市名通过extra传入
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 预测天气请求变量（响应中的变量顺序与此一致）
+DAILY_VARIABLES = [
+    "temperature_2m_max",             # 最高温度
+    "temperature_2m_min",             # 最低温度
+    "weather_code",                   # 天气代码
+    "precipitation_probability_max",  # 最大降水概率
+    "wind_speed_10m_max"              # 最大风速
+]
+
+class ForecastWeatherLoader(OpenMeteoLoader):
     """
     天气预测数据加载器 - PWA版本
     """
     
-    def __init__(self, city: str):
-        """
-        初始化预测数据加载器
-        
-        Args:
-            city: 城市名称
-        """
-        self.city = city
-        self.city_info = self._get_guizhou_city_info(city)
-        self.logger = self._setup_logger()
-        
-        # 缓存设置
-        self.cache = {}
-        self.cache_time = {}
-        self.cache_duration = 3600  # 1小时缓存
-        
-    def _setup_logger(self) -> logging.Logger:
-        """设置日志系统"""
-        logger = logging.getLogger(f"ForecastLoader_{self.city}")
-        logger.setLevel(logging.INFO)
-        return logger
-    
-    def _get_guizhou_city_info(self, city: str) -> Dict:
-        """获取贵州城市信息"""
-        guizhou_cities = {
-            "贵阳市": {"lat": 26.6470, "lon": 106.6302},
-            "毕节市": {"lat": 27.3026, "lon": 105.2840},
-            "遵义市": {"lat": 27.7064, "lon": 106.9373},
-            "六盘水市": {"lat": 26.5935, "lon": 104.8467},
-            "安顺市": {"lat": 26.2537, "lon": 105.9462}
-        }
-        return guizhou_cities.get(city, guizhou_cities["贵阳市"])
+    request_params = {"daily": DAILY_VARIABLES}
+    http_expire_after = 3600  # 与预测缓存一致
     
     def get_forecast_data(self, days: int = 3, target_date: Optional[datetime] = None) -> pd.DataFrame:
         """
@@ -58,104 +43,79 @@ class ForecastWeatherLoader:
         Returns:
             预测天气数据DataFrame
         """
-        cache_key = f"forecast_{days}_{target_date}"
-        
-        # 检查缓存
-        if cache_key in self.cache:
-            cache_time = self.cache_time.get(cache_key)
-            if cache_time and (datetime.now() - cache_time).seconds < self.cache_duration:
-                self.logger.info(f"使用缓存预测数据 - {self.city}")
-                return self.cache[cache_key]
-        
         try:
-            url = "https://api.open-meteo.com/v1/forecast"
-            params = {
-                "latitude": self.city_info["lat"],
-                "longitude": self.city_info["lon"],
-                "daily": ["temperature_2m_max", "temperature_2m_min", "weather_code", 
-                         "precipitation_probability_max", "wind_speed_10m_max"],
-                "timezone": "Asia/Shanghai",
-                "forecast_days": days
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if "daily" not in data:
-                return pd.DataFrame()
-            
-            daily_data = data["daily"]
-            
-            # 创建DataFrame
-            forecast_list = []
-            for i in range(len(daily_data["time"])):
-                weather_code = daily_data["weather_code"][i]
-                
-                forecast_list.append({
-                    'date': datetime.strptime(daily_data["time"][i], "%Y-%m-%d"),
-                    'temperature_2m_max': daily_data["temperature_2m_max"][i],
-                    'temperature_2m_min': daily_data["temperature_2m_min"][i],
-                    'weather_code': weather_code,
-                    'weather_condition': self._get_weather_condition_chinese(weather_code),
-                    'precipitation_probability': daily_data.get("precipitation_probability_max", [0])[i],
-                    'wind_speed_max': daily_data.get("wind_speed_10m_max", [0])[i],
-                    'city': self.city,
-                    'data_source': 'Open-Meteo PWA',
-                    'retrieved_at': datetime.now()
-                })
-            
-            forecast_df = pd.DataFrame(forecast_list)
-            
-            # 缓存数据
-            self.cache[cache_key] = forecast_df
-            self.cache_time[cache_key] = datetime.now()
-            
-            self.logger.info(f"成功获取PWA预测数据 - {self.city}, {days}天")
-            return forecast_df
+            return self._fetch_forecast(days, target_date)
             
         except Exception as e:
-            self.logger.error(f"获取预测数据失败: {e}")
+            logger.error("获取预测数据失败: %s", e, extra={"city": self.city})
             
-            # 返回离线数据
+            # 返回离线数据（不进入缓存，下次调用会重新请求）
             return self._get_offline_forecast(days)
     
-    def _get_offline_forecast(self, days: int) -> pd.DataFrame:
-        """获取离线预测数据"""
-        forecast_list = []
-        base_date = datetime.now()
+    @cached(_CACHE, key=lambda self, days, target_date: ('forecast', self.city, days, target_date),
+            lock=_CACHE_LOCK)
+    def _fetch_forecast(self, days: int, target_date: Optional[datetime]) -> pd.DataFrame:
+        """从Open-Meteo获取预测数据，成功结果写入进程级缓存"""
+        forecast_df = self._build_df(self._request([self], forecast_days=days)[0])
+        if forecast_df is None:
+            return pd.DataFrame()
         
-        for i in range(days):
-            date = base_date + timedelta(days=i)
-            
-            # 简单模拟数据
-            forecast_list.append({
-                'date': date,
-                'temperature_2m_max': 20 + i,
-                'temperature_2m_min': 15 + i,
-                'weather_code': 1 if i % 2 == 0 else 3,
-                'weather_condition': '晴' if i % 2 == 0 else '多云',
-                'precipitation_probability': 20 if i % 3 == 0 else 0,
-                'wind_speed_max': 3 + i,
-                'city': self.city,
-                'data_source': '离线缓存',
-                'retrieved_at': datetime.now()
-            })
+        logger.info("成功获取PWA预测数据 - %s, %s天", self.city, days, extra={"city": self.city})
+        return forecast_df
+    
+    def _build_df(self, response) -> Optional[pd.DataFrame]:
+        """将API响应转换为预测数据DataFrame"""
+        daily = response.Daily()
+        if daily is None:
+            return None
+        
+        # 时间戳为UTC，加上时区偏移得到当地日期
+        utc_offset = response.UtcOffsetSeconds()
+        dates = pd.date_range(
+            start=pd.to_datetime(daily.Time() + utc_offset, unit="s"),
+            end=pd.to_datetime(daily.TimeEnd() + utc_offset, unit="s"),
+            freq=pd.Timedelta(seconds=daily.Interval()),
+            inclusive="left"
+        )
+        
+        # 按列创建DataFrame，变量顺序与请求参数daily一致
+        forecast_df = pd.DataFrame({
+            'date': dates,
+            'temperature_2m_max': daily.Variables(0).ValuesAsNumpy(),
+            'temperature_2m_min': daily.Variables(1).ValuesAsNumpy(),
+            'weather_code': pd.array(daily.Variables(2).ValuesAsNumpy(), dtype='Int16'),  # 缺测值为<NA>
+            'precipitation_probability': daily.Variables(3).ValuesAsNumpy(),
+            'wind_speed_max': daily.Variables(4).ValuesAsNumpy()
+        })
+        forecast_df.insert(4, 'weather_condition', self._map_weather(forecast_df['weather_code']))
         
-        return pd.DataFrame(forecast_list)
+        # 标量列在创建后赋值，由pandas广播到所有行
+        forecast_df['city'] = self.city
+        forecast_df['data_source'] = 'Open-Meteo PWA'
+        forecast_df['retrieved_at'] = pd.Timestamp.now(tz=TIMEZONE)
+        return forecast_df
     
-    def _get_weather_condition_chinese(self, weather_code: int) -> str:
-        """将天气代码转换为中文描述"""
-        weather_map = {
-            0: "晴", 1: "主要晴", 2: "局部多云", 3: "多云",
-            45: "雾", 48: "雾",
-            51: "小雨", 53: "中雨", 55: "大雨",
-            61: "小雨", 63: "中雨", 65: "大雨",
-            80: "阵雨", 81: "中阵雨", 82: "强阵雨",
-            95: "雷暴", 96: "雷暴", 99: "强雷暴"
-        }
-        return weather_map.get(weather_code, "未知")
+    def _get_offline_forecast(self, days: int) -> pd.DataFrame:
+        """获取离线预测数据"""
+        # 只取一次当前时间；日期列与在线预测一致，使用不带时区的当地时间
+        now = pd.Timestamp.now(tz=TIMEZONE)
+        i = np.arange(days)
+        is_sunny = i % 2 == 0
+        
+        # 简单模拟数据，按列一次生成
+        forecast_df = pd.DataFrame({
+            'date': pd.date_range(now.tz_localize(None), periods=days, freq='D'),
+            'temperature_2m_max': 20 + i,
+            'temperature_2m_min': 15 + i,
+            'weather_code': np.where(is_sunny, 1, 3).astype(np.int16),
+            'weather_condition': np.where(is_sunny, '晴', '多云'),
+            'precipitation_probability': np.where(i % 3 == 0, 20, 0),
+            'wind_speed_max': 3 + i
+        })
+        forecast_df['city'] = self.city
+        forecast_df['data_source'] = '离线缓存'
+        forecast_df['retrieved_at'] = now
+        return forecast_df
     
     def get_health_status(self) -> Dict:
         """获取服务健康状态"""
@@ -166,7 +126,7 @@ class ForecastWeatherLoader:
                 "status": "healthy",
                 "city": self.city,
                 "pwa_support": True,
-                "cache_enabled": len(self.cache) > 0,
+                "cache_enabled": ('forecast', self.city, 1, None) in _CACHE,
                 "offline_support": True,
                 "parameters_available": len(test_data.columns) if not test_data.empty else 0
             }
@@ -3,18 +3,84 @@
 专注于为PWA应用提供实时天气数据
 """
 
+import asyncio
+import functools
+import numpy as np
 import pandas as pd
-import requests
-from datetime import datetime
 import logging
+import threading
 import time
-from typing import Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+import openmeteo_requests
+from openmeteo_requests import OpenMeteoRequestsError
+from base_loader import API_URL, NETWORK_ERRORS, REQUEST_TIMEOUT, TIMEZONE, OpenMeteoLoader, _CACHE, _CACHE_LOCK
+from cities import GUIZHOU_CITIES
 
-class RealTimeWeatherLoader:
+# 模块级日志记录器，城市名通过extra传入
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 异步客户端：多城市并发请求时使用，每次请求后释放连接，不绑定事件循环
+async_openmeteo = openmeteo_requests.AsyncClient()
+
+# 有界请求线程池：限制同时进行的API请求数；相同请求进行中时复用同一个Future
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openmeteo")
+_PENDING: Dict[tuple, Future] = {}
+_PENDING_LOCK = threading.RLock()  # 已完成的Future会在add_done_callback中同步回调
+
+# 实时天气请求变量（响应中的变量顺序与此一致）
+CURRENT_VARIABLES = [
+    "temperature_2m",        # 2米高度温度
+    "relative_humidity_2m",  # 2米高度相对湿度
+    "apparent_temperature",  # 体感温度
+    "pressure_msl",          # 海平面气压
+    "wind_speed_10m",        # 10米高度风速
+    "wind_direction_10m",    # 10米高度风向
+    "wind_gusts_10m",        # 阵风风速
+    "weather_code",          # 天气代码
+    "cloud_cover",           # 云量
+    "visibility",            # 能见度
+    "uv_index",              # 紫外线指数
+    "is_day"                 # 是否白天
+]
+
+# 实时数据列类型：数值列使用紧凑类型（整数列可空，缺测值为<NA>），重复字符串列使用category
+_REALTIME_DTYPES = {
+    'temperature': 'float32',
+    'humidity': 'float32',
+    'pressure': 'float32',
+    'wind_speed': 'float32',
+    'wind_direction': 'Int16',
+    'wind_gusts': 'float32',
+    'weather_code': 'Int16',
+    'weather_condition': 'category',
+    'cloud_cover': 'Int8',
+    'visibility': 'float32',
+    'uv_index': 'float32',
+    'is_day': 'Int8',
+    'apparent_temperature': 'float32',
+    'comfort_index': 'float32',
+    'city': 'category',
+    'pwa_mode': 'category',
+    'offline_support': 'bool',
+    'cache_enabled': 'bool'
+}
+
+# 整数型请求变量：API缺测时返回NaN，转换为<NA>
+_INT_VARIABLES = ("wind_direction_10m", "weather_code", "cloud_cover", "is_day")
+
+# 健康风险等级标签，按风险分数索引
+_HEALTH_RISK_LABELS = np.array(["低", "中", "高"])
+
+class RealTimeWeatherLoader(OpenMeteoLoader):
     """
     实时天气数据加载器 - PWA版本
     """
     
+    request_params = {"current": CURRENT_VARIABLES, "forecast_days": 1}
+    http_expire_after = 300
+    
     def __init__(self, city: str):
         """
         初始化实时数据加载器
@@ -22,60 +88,12 @@ class RealTimeWeatherLoader:
         Args:
             city: 城市名称
         """
-        self.city = city
-        self.city_info = self._get_guizhou_city_info(city)
-        self.logger = self._setup_logger()
+        super().__init__(city)
         
-        # PWA缓存设置：支持离线使用
-        self.cache_duration = 300  # 5分钟缓存
-        self.offline_cache_duration = 3600  # 离线时1小时缓存
-        self.last_update = None
-        self.cached_data = None
+        # 上次请求是否成功，失败后改用离线缓存
         self.last_online_status = True
         
-        self.logger.info(f"初始化PWA实时天气加载器 - 城市: {city}")
-    
-    def _setup_logger(self) -> logging.Logger:
-        """设置日志系统"""
-        logger = logging.getLogger(f"RealTimeLoader_{self.city}")
-        logger.setLevel(logging.INFO)
-        return logger
-    
-    def _get_guizhou_city_info(self, city: str) -> Dict:
-        """获取贵州城市的坐标和基本信息"""
-        guizhou_cities = {
-            "贵阳市": {
-                "lat": 26.6470, 
-                "lon": 106.6302, 
-                "elevation": 1071,
-                "description": "贵州省会，林城"
-            },
-            "毕节市": {
-                "lat": 27.3026, 
-                "lon": 105.2840, 
-                "elevation": 1510,
-                "description": "黔西北高原城市"
-            },
-            "遵义市": {
-                "lat": 27.7064, 
-                "lon": 106.9373, 
-                "elevation": 865,
-                "description": "黔北重要城市"
-            },
-            "六盘水市": {
-                "lat": 26.5935, 
-                "lon": 104.8467, 
-                "elevation": 1850,
-                "description": "中国凉都"
-            },
-            "安顺市": {
-                "lat": 26.2537, 
-                "lon": 105.9462, 
-                "elevation": 1380,
-                "description": "黄果树瀑布所在地"
-            }
-        }
-        return guizhou_cities.get(city, guizhou_cities["贵阳市"])
+        logger.info("初始化PWA实时天气加载器 - 城市: %s", city, extra={"city": self.city})
     
     def get_realtime_data(self) -> pd.DataFrame:
         """
@@ -85,115 +103,127 @@ class RealTimeWeatherLoader:
             包含实时天气数据的DataFrame
         """
         try:
-            # 检查缓存是否有效
-            cache_duration = self.cache_duration
-            
-            # 如果可能离线，延长缓存时间
-            if not self._check_online_status():
-                cache_duration = self.offline_cache_duration
-                self.logger.info(f"可能处于离线状态，使用延长缓存 - {self.city}")
-            
-            if self._should_use_cache(cache_duration):
-                self.logger.info(f"使用缓存数据 - {self.city}")
-                self.cached_data['data_source'] = 'PWA缓存数据'
-                self.cached_data['pwa_mode'] = 'cached'
-                return self.cached_data
+            cached_data = self._get_cached_data()
+            if cached_data is not None:
+                return cached_data
             
             # 从Open-Meteo API获取真实数据
-            real_data = self._fetch_from_openmeteo()
-            if real_data is not None:
-                self.cached_data = real_data
-                self.last_update = datetime.now()
-                self.last_online_status = True
-                self.logger.info(f"成功获取PWA实时数据 - {self.city}")
-                return real_data
-            
-            # 如果API返回None，使用缓存或生成离线数据
-            if self.cached_data is not None:
-                self.logger.warning(f"使用旧缓存数据 - {self.city}")
-                self.cached_data['data_source'] = 'PWA离线缓存'
-                self.cached_data['pwa_mode'] = 'offline'
-                return self.cached_data
-            else:
-                self.logger.warning(f"生成离线数据 - {self.city}")
-                return self._generate_offline_data()
+            return self._handle_fetch_result(self._fetch_from_openmeteo())
             
         except Exception as e:
-            self.logger.error(f"获取PWA实时数据失败: {e}")
+            logger.error("获取PWA实时数据失败: %s", e, extra={"city": self.city})
             
             # 返回离线数据
             return self._generate_offline_data()
     
-    def _check_online_status(self) -> bool:
-        """检查网络状态"""
+    async def get_realtime_data_async(self) -> pd.DataFrame:
+        """
+        异步获取实时天气数据，供多城市并发加载使用
+        
+        Returns:
+            包含实时天气数据的DataFrame
+        """
         try:
-            # 简单网络检查
-            requests.head("https://api.open-meteo.com", timeout=3)
-            return True
-        except:
-            return False
+            cached_data = self._get_cached_data()
+            if cached_data is not None:
+                return cached_data
+            
+            return self._handle_fetch_result(await self._fetch_from_openmeteo_async())
+            
+        except Exception as e:
+            logger.error("获取PWA实时数据失败: %s", e, extra={"city": self.city})
+            return self._generate_offline_data()
+    
+    def _get_cached_data(self) -> Optional[pd.DataFrame]:
+        """检查缓存是否有效，有效时返回缓存数据"""
+        with _CACHE_LOCK:
+            cached_data = _CACHE.get(('realtime', self.city))
+            
+            # 上次请求失败（可能离线）时，延长缓存时间
+            if cached_data is None and not self.last_online_status:
+                cached_data = _CACHE.get(('offline', self.city))
+                if cached_data is not None:
+                    logger.info("可能处于离线状态，使用延长缓存 - %s", self.city, extra={"city": self.city})
+        
+        if cached_data is None:
+            return None
+        
+        logger.info("使用缓存数据 - %s", self.city, extra={"city": self.city})
+        return cached_data.assign(data_source='PWA缓存数据', pwa_mode=pd.Categorical(['cached'] * len(cached_data)))
     
-    def _should_use_cache(self, cache_duration: int) -> bool:
-        """检查是否应该使用缓存数据"""
-        return (self.cached_data is not None and 
-                self.last_update and 
-                (datetime.now() - self.last_update).total_seconds() < cache_duration)
+    def _handle_fetch_result(self, real_data: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """请求成功时恢复在线状态，失败时使用缓存或生成离线数据"""
+        if real_data is not None:
+            self.last_online_status = True
+            logger.info("成功获取PWA实时数据 - %s", self.city, extra={"city": self.city})
+            return real_data
+        
+        # 如果API返回None，使用缓存或生成离线数据
+        with _CACHE_LOCK:
+            cached_data = _CACHE.get(('offline', self.city))
+        if cached_data is not None:
+            logger.warning("使用旧缓存数据 - %s", self.city, extra={"city": self.city})
+            return cached_data.assign(data_source='PWA离线缓存', pwa_mode=pd.Categorical(['offline'] * len(cached_data)))
+        else:
+            logger.warning("生成离线数据 - %s", self.city, extra={"city": self.city})
+            return self._generate_offline_data()
     
     def _fetch_from_openmeteo(self) -> Optional[pd.DataFrame]:
         """
         从Open-Meteo API获取PWA优化天气数据
+        
+        一次请求同时获取所有贵州城市，顺带填充其他城市的缓存
         """
         try:
-            url = "https://api.open-meteo.com/v1/forecast"
-            params = {
-                "latitude": self.city_info["lat"],
-                "longitude": self.city_info["lon"],
-                "current": [
-                    "temperature_2m",        # 2米高度温度
-                    "relative_humidity_2m",  # 2米高度相对湿度
-                    "apparent_temperature",  # 体感温度
-                    "pressure_msl",          # 海平面气压
-                    "wind_speed_10m",        # 10米高度风速
-                    "wind_direction_10m",    # 10米高度风向
-                    "wind_gusts_10m",        # 阵风风速
-                    "weather_code",          # 天气代码
-                    "cloud_cover",           # 云量
-                    "visibility",            # 能见度
-                    "uv_index",              # 紫外线指数
-                    "is_day"                 # 是否白天
-                ],
-                "timezone": "Asia/Shanghai",
-                "forecast_days": 1
-            }
-            
-            self.logger.info(f"请求PWA天气API - {self.city}")
+            logger.info("请求PWA天气API - %s", self.city, extra={"city": self.city})
+            cities = list(dict.fromkeys([*GUIZHOU_CITIES, self.city]))
+            return _submit_fetch(cities).result().get(self.city)
             
-            # 发送API请求，设置超时时间
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # 验证API响应数据
-            if "current" not in data:
-                self.logger.error("API响应缺少current字段")
-                return None
-            
-            current = data["current"]
-            
-            # 创建PWA优化数据框架
-            realtime_df = self._create_pwa_dataframe(current)
-            return realtime_df
-            
-        except requests.exceptions.Timeout:
-            self.logger.error("API请求超时")
+        except OpenMeteoRequestsError as e:
+            logger.error("API请求失败: %s", e, extra={"city": self.city})
+            # 只有连接失败或超时才视为离线，之后使用延长缓存
+            if isinstance(e.__cause__, NETWORK_ERRORS):
+                self.last_online_status = False
+            return None
+        except Exception as e:
+            logger.error("处理API响应时发生错误: %s", e, extra={"city": self.city})
             return None
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"API请求失败: {e}")
+    
+    async def _fetch_from_openmeteo_async(self) -> Optional[pd.DataFrame]:
+        """异步获取当前城市的天气数据，与其他城市的请求并发执行"""
+        try:
+            logger.info("异步请求PWA天气API - %s", self.city, extra={"city": self.city})
+            responses = await async_openmeteo.weather_api(
+                API_URL, params=self._build_params([self]), timeout=REQUEST_TIMEOUT
+            )
+            return _store_responses([self], responses).get(self.city)
+            
+        except OpenMeteoRequestsError as e:
+            logger.error("API请求失败: %s", e, extra={"city": self.city})
+            # 只有连接失败或超时才视为离线，之后使用延长缓存
+            if isinstance(e.__cause__, NETWORK_ERRORS):
+                self.last_online_status = False
             return None
         except Exception as e:
-            self.logger.error(f"处理API响应时发生错误: {e}")
+            logger.error("处理API响应时发生错误: %s", e, extra={"city": self.city})
+            return None
+    
+    def _build_df(self, response) -> Optional[pd.DataFrame]:
+        """将API响应转换为实时数据DataFrame"""
+        current = response.Current()
+        if current is None:
+            logger.error("API响应缺少current字段 - %s", self.city, extra={"city": self.city})
             return None
+        
+        # 变量顺序与请求参数current一致；float32数值按API精度保留两位小数
+        current_data = {
+            name: round(current.Variables(i).Value(), 2)
+            for i, name in enumerate(CURRENT_VARIABLES)
+        }
+        for name in _INT_VARIABLES:
+            value = current_data[name]
+            current_data[name] = int(value) if np.isfinite(value) else pd.NA
+        return self._create_pwa_dataframe(current_data)
     
     def _create_pwa_dataframe(self, current_data: Dict) -> pd.DataFrame:
         """
@@ -203,11 +233,14 @@ class RealTimeWeatherLoader:
         weather_code = current_data.get("weather_code", 0)
         weather_condition = self._get_weather_condition_chinese(weather_code)
         
+        # 同一行的时间列共用一次取到的当前时间
+        now = pd.Timestamp.now(tz=TIMEZONE)
+        
         # 构建PWA数据字典
         data_dict = {
             # 核心天气数据
-            'date': [datetime.now()],
-            'timestamp': [datetime.now().timestamp()],
+            'date': [now],
+            'timestamp': [now.timestamp()],
             'temperature': [current_data.get("temperature_2m", 0)],
             'humidity': [current_data.get("relative_humidity_2m", 0)],
             'pressure': [current_data.get("pressure_msl", 0)],
@@ -244,19 +277,20 @@ class RealTimeWeatherLoader:
             # PWA标识
             'data_source': ['Open-Meteo PWA API'],
             'pwa_mode': ['online'],
-            'update_time': [datetime.now()],
+            'update_time': [now],
             'data_quality': ['PWA实时数据'],
             'offline_support': [True],
             'cache_enabled': [True]
         }
         
-        return pd.DataFrame(data_dict)
+        return pd.DataFrame(data_dict).astype(_REALTIME_DTYPES)
     
     def _generate_offline_data(self) -> pd.DataFrame:
         """生成离线数据"""
+        now = pd.Timestamp.now(tz=TIMEZONE)
         data_dict = {
-            'date': [datetime.now()],
-            'timestamp': [datetime.now().timestamp()],
+            'date': [now],
+            'timestamp': [now.timestamp()],
             'temperature': [20.0],  # 默认温度
             'humidity': [60.0],     # 默认湿度
             'pressure': [1013.0],
@@ -279,64 +313,39 @@ class RealTimeWeatherLoader:
             'city_description': [self.city_info["description"]],
             'data_source': ['PWA离线数据'],
             'pwa_mode': ['offline'],
-            'update_time': [datetime.now()],
+            'update_time': [now],
             'data_quality': ['离线缓存数据'],
             'offline_support': [True],
             'cache_enabled': [True]
         }
         
-        return pd.DataFrame(data_dict)
+        return pd.DataFrame(data_dict).astype(_REALTIME_DTYPES)
     
-    def _calculate_comfort_index(self, temp: float, humidity: float, wind_speed: float) -> float:
-        """计算舒适度指数"""
-        # 简化舒适度计算
-        base_comfort = 100
+    @staticmethod
+    def _calculate_comfort_index(temp, humidity, wind_speed):
+        """计算舒适度指数（支持标量或NumPy数组批量计算）"""
+        temp, humidity, wind_speed = np.asarray(temp), np.asarray(humidity), np.asarray(wind_speed)
         
-        # 温度影响 (最适温度22°C)
-        temp_effect = abs(temp - 22) * 2
-        # 湿度影响 (最适湿度50%)
-        humidity_effect = abs(humidity - 50) * 0.5
-        # 风速影响 (最适风速1-3m/s)
-        wind_effect = abs(wind_speed - 2) * 5 if wind_speed > 5 else 0
+        # 简化舒适度计算：温度影响 (最适温度22°C)、湿度影响 (最适湿度50%)、风速影响 (最适风速1-3m/s)
+        temp_effect = np.abs(temp - 22) * 2
+        humidity_effect = np.abs(humidity - 50) * 0.5
+        wind_effect = np.where(wind_speed > 5, np.abs(wind_speed - 2) * 5, 0.0)
         
-        comfort_score = base_comfort - temp_effect - humidity_effect - wind_effect
-        return max(0, min(100, comfort_score))
+        return np.clip(100 - temp_effect - humidity_effect - wind_effect, 0, 100)
     
-    def _calculate_health_risk_level(self, temp: float, humidity: float, uv_index: float) -> str:
-        """计算健康风险等级"""
-        risk_score = 0
+    @staticmethod
+    def _calculate_health_risk_level(temp, humidity, uv_index):
+        """计算健康风险等级（支持标量或NumPy数组批量计算）"""
+        temp, humidity, uv_index = np.asarray(temp), np.asarray(humidity), np.asarray(uv_index)
         
-        if temp < 10 or temp > 30:
-            risk_score += 2
-        elif temp < 15 or temp > 25:
-            risk_score += 1
-            
-        if humidity > 80 or humidity < 30:
-            risk_score += 1
-            
-        if uv_index > 6:
-            risk_score += 2
-        elif uv_index > 3:
-            risk_score += 1
-            
-        if risk_score >= 3:
-            return "高"
-        elif risk_score >= 2:
-            return "中"
-        else:
-            return "低"
-    
-    def _get_weather_condition_chinese(self, weather_code: int) -> str:
-        """将天气代码转换为中文描述"""
-        weather_map = {
-            0: "晴", 1: "主要晴", 2: "局部多云", 3: "多云",
-            45: "雾", 48: "雾",
-            51: "小雨", 53: "中雨", 55: "大雨",
-            61: "小雨", 63: "中雨", 65: "大雨",
-            80: "阵雨", 81: "中阵雨", 82: "强阵雨",
-            95: "雷暴", 96: "雷暴", 99: "强雷暴"
-        }
-        return weather_map.get(weather_code, "未知")
+        risk_score = (
+            np.select([(temp < 10) | (temp > 30), (temp < 15) | (temp > 25)], [2, 1], default=0)
+            + ((humidity > 80) | (humidity < 30))
+            + np.select([uv_index > 6, uv_index > 3], [2, 1], default=0)
+        )
+        
+        # 0-1分为低，2分为中，3分及以上为高
+        return _HEALTH_RISK_LABELS[np.clip(risk_score - 1, 0, 2)]
     
     def get_health_status(self) -> Dict:
         """获取服务健康状态"""
@@ -348,8 +357,8 @@ class RealTimeWeatherLoader:
                 "city": self.city,
                 "pwa_support": True,
                 "offline_support": True,
-                "cache_enabled": self.cached_data is not None,
-                "last_update": self.last_update,
+                "cache_enabled": ('offline', self.city) in _CACHE,
+                "last_update": test_data['update_time'].iloc[0],
                 "data_source": test_data['data_source'].iloc[0],
                 "pwa_mode": test_data['pwa_mode'].iloc[0],
                 "comfort_index": test_data['comfort_index'].iloc[0],
@@ -365,6 +374,138 @@ class RealTimeWeatherLoader:
             }
 
 
+# ===== 批量获取 =====
+def _store_responses(loaders: List[RealTimeWeatherLoader], responses) -> Dict[str, pd.DataFrame]:
+    """解析各城市的API响应（顺序与坐标一致），并写入进程级缓存"""
+    results = {}
+    for loader, response in zip(loaders, responses):
+        # 单个城市响应无法解析时只跳过该城市，不影响同批次其他城市
+        try:
+            realtime_df = loader._build_df(response)
+        except Exception as e:
+            logger.error("处理API响应时发生错误: %s", e, extra={"city": loader.city})
+            continue
+        if realtime_df is not None:
+            results[loader.city] = realtime_df
+    
+    with _CACHE_LOCK:
+        for city, realtime_df in results.items():
+            _CACHE[('realtime', city)] = realtime_df
+            _CACHE[('offline', city)] = realtime_df
+    
+    return results
+
+
+def fetch_all_cities(cities: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    一次API请求获取多个城市的实时天气，并写入进程级缓存
+    
+    Args:
+        cities: 城市名称列表
+        
+    Returns:
+        城市名称到实时数据DataFrame的字典
+    """
+    loaders = [RealTimeWeatherLoader(city) for city in cities]
+    return _store_responses(loaders, RealTimeWeatherLoader._request(loaders))
+
+
+def _submit_fetch(cities: List[str]) -> Future:
+    """将批量请求提交到线程池，同一批城市已有请求进行中时直接复用其Future"""
+    key = tuple(cities)
+    with _PENDING_LOCK:
+        future = _PENDING.get(key)
+        if future is None:
+            future = _POOL.submit(fetch_all_cities, cities)
+            _PENDING[key] = future
+            future.add_done_callback(lambda _: _discard_pending(key))
+    return future
+
+
+def _discard_pending(key: tuple):
+    """请求完成后移除进行中记录，之后的调用走缓存或重新请求"""
+    with _PENDING_LOCK:
+        _PENDING.pop(key, None)
+
+
+async def gather_cities(cities: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    并发获取多个城市的实时天气，总耗时约等于最慢的一次请求
+    
+    Args:
+        cities: 城市名称列表
+        
+    Returns:
+        城市名称到实时数据DataFrame的字典
+    """
+    loaders = [RealTimeWeatherLoader(city) for city in cities]
+    results = await asyncio.gather(*(loader.get_realtime_data_async() for loader in loaders))
+    return dict(zip(cities, results))
+
+
+# ===== 批量评分 =====
+@functools.lru_cache(maxsize=None)
+def _get_score_kernel():
+    """首次批量评分时导入numba并构建评分内核，避免拖慢模块导入；未安装numba时返回None"""
+    try:
+        from numba import njit, prange
+    except ImportError:  # numba为可选依赖，未安装时批量评分使用NumPy版本
+        return None
+    
+    @njit(parallel=True, cache=True)
+    def _score_batch(temp, humidity, wind_speed, uv_index, comfort_out, risk_out):
+        """单次遍历同时计算舒适度指数和风险等级索引，规则与NumPy版本一致"""
+        for i in prange(temp.shape[0]):
+            t, h, w, u = temp[i], humidity[i], wind_speed[i], uv_index[i]
+            
+            wind_effect = abs(w - 2) * 5 if w > 5 else 0.0
+            comfort = 100 - abs(t - 22) * 2 - abs(h - 50) * 0.5 - wind_effect
+            comfort_out[i] = min(max(comfort, 0.0), 100.0)
+            
+            risk_score = 0
+            if t < 10 or t > 30:
+                risk_score += 2
+            elif t < 15 or t > 25:
+                risk_score += 1
+            if h > 80 or h < 30:
+                risk_score += 1
+            if u > 6:
+                risk_score += 2
+            elif u > 3:
+                risk_score += 1
+            risk_out[i] = min(max(risk_score - 1, 0), 2)
+    
+    return _score_batch
+
+
+def batch_score(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    批量计算多行天气数据的舒适度指数和健康风险等级
+    
+    Args:
+        df: 包含temperature、humidity、wind_speed、uv_index列的DataFrame
+        
+    Returns:
+        包含comfort_index和health_risk_level列的DataFrame（索引与输入一致）
+    """
+    temp = df['temperature'].to_numpy(np.float64)
+    humidity = df['humidity'].to_numpy(np.float64)
+    wind_speed = df['wind_speed'].to_numpy(np.float64)
+    uv_index = df['uv_index'].to_numpy(np.float64)
+    
+    score_kernel = _get_score_kernel()
+    if score_kernel is not None:
+        comfort = np.empty(len(df))
+        risk = np.empty(len(df), dtype=np.int8)
+        score_kernel(temp, humidity, wind_speed, uv_index, comfort, risk)
+        risk_level = _HEALTH_RISK_LABELS[risk]
+    else:
+        comfort = RealTimeWeatherLoader._calculate_comfort_index(temp, humidity, wind_speed)
+        risk_level = RealTimeWeatherLoader._calculate_health_risk_level(temp, humidity, uv_index)
+    
+    return pd.DataFrame({'comfort_index': comfort, 'health_risk_level': risk_level}, index=df.index)
+
+
 # ===== 测试函数 =====
 def test_pwa_realtime_loader():
     """测试PWA实时数据加载器"""
@@ -373,14 +514,14 @@ def test_pwa_realtime_loader():
     
     cities = ["贵阳市", "毕节市", "遵义市", "六盘水市", "安顺市"]
     
-    for city in cities:
+    # 所有城市并发请求
+    all_data = asyncio.run(gather_cities(cities))
+    
+    for city, data in all_data.items():
         print(f"\n🎯 测试城市: {city}")
         print("-" * 30)
         
         try:
-            loader = RealTimeWeatherLoader(city)
-            data = loader.get_realtime_data()
-            
             if data is not None and not data.empty:
                 print(f"✅ PWA数据获取成功")
                 print(f"   模式: {data['pwa_mode'].iloc[0]}")